@@ -1,37 +1,183 @@
-from flask import Flask, request, jsonify
+# Patch stdlib socket/ssl/threading before anything else imports them so they cooperate with gevent
+from gevent import monkey
+monkey.patch_all()
+
+from flask import Flask, g, request
+from flask.json.provider import DefaultJSONProvider
 import functools
 import argparse
-import json
+import os
+import sys
+import logging
+import logging.handlers
+import queue
+import platform
+from urllib.parse import unquote_plus
+
+if platform.python_implementation() == 'PyPy':
+    # orjson is CPython-only; ujson is the fast serializer that runs under PyPy
+    import ujson
+
+    def json_dumps(obj):
+        return ujson.dumps(obj, escape_forward_slashes=False).encode()
+
+    json_loads = ujson.loads
+else:
+    import orjson
+
+    def json_dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    json_loads = orjson.loads
+
+logger = logging.getLogger(__name__)
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider that serializes with orjson (or ujson on PyPy) instead of the stdlib json module"""
+
+    def dumps(self, obj, **kwargs):
+        return json_dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return json_loads(s)
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
+
+# Set when serving plain HTTP on a Unix domain socket for a co-located proxy (see --unix-socket)
+UNIX_SOCKET = os.environ.get('BACKEND_UNIX_SOCKET')
+
+GUNICORN_CONF = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gunicorn_conf.py')
+
+def configure_logging(debug=False):
+    """
+    Route log records through a queue so formatting and stdout writes happen on a
+    background listener thread instead of the request path.
+
+    Returns the started QueueListener; call stop() on it to flush pending records.
+    """
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(logging.DEBUG if debug else logging.INFO)
+    logger.propagate = False
+    listener.start()
+    return listener
+
+# Rejections are pre-serialized once at import instead of rebuilt for every denied request
+_ACCESS_DENIED = (json_dumps({'error': 'Access denied'}), 403, {'Content-Type': 'application/json'})
+_DIRECT_ACCESS_DENIED = (json_dumps({'error': 'Direct access not allowed'}), 403, {'Content-Type': 'application/json'})
+
+@app.before_request
+def resolve_proxy_access():
+    """Decide once per request whether it came through the proxy; check_proxy reads the result"""
+    if request.remote_addr != '127.0.0.1' and not (UNIX_SOCKET and not request.remote_addr):
+        # Only allow requests from localhost (where the proxy runs); Unix socket peers have no address
+        # and are already restricted to local users by the socket's file permissions
+        g.proxy_denial = _ACCESS_DENIED
+    elif 'X-Forwarded-For' not in request.headers:
+        # Verify the request came through our proxy by checking headers
+        g.proxy_denial = _DIRECT_ACCESS_DENIED
+    else:
+        g.proxy_denial = None
 
 def check_proxy(f):
     @functools.wraps(f)
     def decorated_function(*args, **kwargs):
-        # Only allow requests from localhost (where the proxy runs)
-        if request.remote_addr != '127.0.0.1':
-            return jsonify({'error': 'Access denied'}), 403
-            
-        # Verify the request came through our proxy by checking headers
-        if 'X-Forwarded-For' not in request.headers:
-            return jsonify({'error': 'Direct access not allowed'}), 403
-            
+        if g.proxy_denial is not None:
+            return g.proxy_denial
         return f(*args, **kwargs)
     return decorated_function
 
-@app.route('/health')
+# The health response never varies, so build it once; nothing in the request pipeline mutates it
+_HEALTH_RESPONSE = app.response_class('', status=200, mimetype='text/plain')
+
+@app.route('/health', strict_slashes=False)
 @check_proxy
 def health_check():
     """Health check endpoint that returns 200 OK if server is running"""
-    # Log health check request
-    print("\n=== Health Check Request ===")
-    print(f"Method: {request.method}")
-    print(f"Remote Addr: {request.remote_addr}")
-    print("Headers:")
-    for header, value in request.headers.items():
-        print(f"  {header}: {value}")
-    print("================\n")
-    return '', 200
+    if app.config['DEBUG_MODE']:
+        logger.debug("Health check request: method=%s remote_addr=%s headers=%s",
+                     request.method, request.remote_addr, dict(request.headers))
+    return _HEALTH_RESPONSE
+
+def environ_headers(environ):
+    """Collect request headers straight from the WSGI environ in a single pass, bypassing Werkzeug's EnvironHeaders"""
+    hdrs = {key[5:].replace('_', '-').title(): value
+            for key, value in environ.items() if key.startswith('HTTP_')}
+    # Werkzeug also exposes these two as headers even though CGI strips their HTTP_ prefix
+    if environ.get('CONTENT_TYPE'):
+        hdrs['Content-Type'] = environ['CONTENT_TYPE']
+    if environ.get('CONTENT_LENGTH'):
+        hdrs['Content-Length'] = environ['CONTENT_LENGTH']
+    return hdrs
+
+def query_params(req):
+    """
+    Parse the query string straight from the WSGI environ. Single-valued query strings
+    (the common case) skip Werkzeug's MultiDict; repeated keys fall back to request.args
+    so the first value wins exactly as before.
+    """
+    raw = req.environ.get('QUERY_STRING', '')
+    if not raw:
+        return {}
+    params = {}
+    for pair in raw.split('&'):
+        if not pair:
+            continue
+        key, _, value = pair.partition('=')
+        if key in params:
+            return req.args.to_dict()
+        params[key] = value
+    # Only pay for percent/plus decoding when the query string actually uses it
+    if '%' in raw or '+' in raw:
+        decoded = {unquote_plus(key): unquote_plus(value) for key, value in params.items()}
+        if len(decoded) != len(params):
+            return req.args.to_dict()
+        params = decoded
+    return params
+
+def decode_body(req):
+    """
+    Decode the request body for the echo response, reading the raw bytes once without caching them.
+    JSON bodies are parsed with the fast JSON library (None if malformed, like get_json(silent=True));
+    anything else is decoded to text with undecodable bytes replaced.
+    """
+    raw = req.get_data(cache=False)
+    if req.is_json:
+        try:
+            return json_loads(raw)
+        except ValueError:
+            return None
+    return raw.decode('utf-8', 'replace')
+
+# The catch_all response always has the same shape, so its fixed parts are pre-encoded
+_RESPONSE_PREFIX = b'{"status":"success","message":"Request received successfully (SSL)","path":'
+
+def build_response_body(path, method, hdrs, qs, body, environ, port=None):
+    """
+    Serialize the catch_all response without building an intermediate dict: each variable
+    field is encoded on its own and spliced between the pre-encoded constant fragments.
+    The port is only included when given (debug mode).
+    """
+    parts = [
+        _RESPONSE_PREFIX, json_dumps(path),
+        b',"method":', json_dumps(method),
+        b',"headers":', json_dumps(hdrs),
+        b',"query_params":', json_dumps(qs),
+        b',"body":', json_dumps(body),
+        b',"ssl_info":{"protocol":', json_dumps(environ.get('SSL_PROTOCOL', 'Unknown')),
+        b',"cipher":', json_dumps(environ.get('SSL_CIPHER', 'Unknown')),
+        b',"forwarded_proto":', json_dumps(hdrs.get('X-Forwarded-Proto', 'Unknown')),
+        b'}',
+    ]
+    if port is not None:
+        parts += [b',"port":', json_dumps(port)]
+    parts.append(b'}')
+    return b''.join(parts)
 
 @app.route('/', defaults={'path': ''}, methods=['GET', 'POST'])
 @app.route('/<path:path>', methods=['GET', 'POST'])
@@ -41,43 +187,27 @@ def catch_all(path):
     Catch-all route that handles all incoming requests and returns basic info
     about the request along with a 200 status code
     """
-    # Log request details
-    print("\n=== Incoming Request ===")
-    print(f"Method: {request.method}")
-    print(f"Path: /{path}")
-    print("Headers:")
-    for header, value in request.headers.items():
-        print(f"  {header}: {value}")
-    print("Query Parameters:", dict(request.args))
-    print("Body:", request.get_json(silent=True) if request.is_json else request.get_data(as_text=True))
-
-    response_data = {
-        'status': 'success',
-        'message': 'Request received successfully (SSL)',
-        'path': path,
-        'method': request.method,
-        'headers': dict(request.headers),
-        'query_params': dict(request.args),
-        'body': request.get_json(silent=True) if request.is_json else request.get_data(as_text=True),
-        'ssl_info': {
-            'protocol': request.environ.get('SSL_PROTOCOL', 'Unknown'),
-            'cipher': request.environ.get('SSL_CIPHER', 'Unknown'),
-            'forwarded_proto': request.headers.get('X-Forwarded-Proto', 'Unknown')
-        }
-    }
+    # Materialize headers, query params and body once and reuse them for logging and the response
+    env = request.environ
+    hdrs = environ_headers(env)
+    qs = query_params(request)
+    body = decode_body(request)
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Incoming request: method=%s path=/%s headers=%s query_params=%s body=%s",
+                     request.method, path, hdrs, qs, body)
 
     # Only include port in response if debug mode was enabled via command line
-    if app.config.get('DEBUG_MODE'):
-        response_data['port'] = request.environ.get('SERVER_PORT')
-    
-    # Log response details
-    print("\n=== Outgoing Response ===")
-    print("Status: 200")
-    print("Response Body:")
-    print(json.dumps(response_data, indent=2))
-    print("================\n")
-    
-    return jsonify(response_data), 200
+    port = env.get('SERVER_PORT') if app.config.get('DEBUG_MODE') else None
+    payload = build_response_body(path, request.method, hdrs, qs, body, env, port)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Outgoing response: status=200 body=%s", payload.decode())
+
+    return app.response_class(payload, mimetype='application/json'), 200
+
+# Gunicorn workers import this module directly, so pick up the settings passed by __main__
+app.config['DEBUG_MODE'] = os.environ.get('BACKEND_DEBUG') == '1'
+configure_logging(app.config['DEBUG_MODE'])
 
 if __name__ == '__main__':
     # Set up argument parser
@@ -86,16 +216,24 @@ if __name__ == '__main__':
                        help='Port number to run the server on (default: 8000)')
     parser.add_argument('--debug', action='store_true',
                        help='Enable debug mode and include port in responses')
+    parser.add_argument('--unix-socket', metavar='PATH',
+                       help='Serve plain HTTP on this Unix domain socket instead of TLS on 127.0.0.1:<port>')
     args = parser.parse_args()
 
-    # Store debug setting in app config
-    app.config['DEBUG_MODE'] = args.debug
-
-    # If the certificate doesn't exist, generate it (reuse the one from the proxy)
-    import os
-    if not (os.path.exists("ssl/server.crt") and os.path.exists("ssl/server.key")):
+    if args.unix_socket:
+        # Plain HTTP for a co-located proxy, so no certificate is needed
+        os.environ['BACKEND_UNIX_SOCKET'] = args.unix_socket
+    elif not (os.path.exists("ssl/server.crt") and os.path.exists("ssl/server.key")):
+        # If the certificate doesn't exist, generate it (reuse the one from the proxy)
         print("Please run the proxy server first to generate the SSL certificate")
         exit(1)
-    
-    # Run on localhost with SSL using specified port
-    app.run(host='127.0.0.1', port=args.port, ssl_context=('ssl/server.crt', 'ssl/server.key'), debug=args.debug)
\ No newline at end of file
+
+    # Hand the process over to gunicorn with gevent workers; settings travel via the environment
+    os.environ['BACKEND_PORT'] = str(args.port)
+    os.environ['BACKEND_DEBUG'] = '1' if args.debug else '0'
+    os.execvp(sys.executable, [
+        sys.executable, '-m', 'gunicorn',
+        '-c', GUNICORN_CONF,
+        '--pythonpath', os.path.dirname(GUNICORN_CONF),
+        'backend_server:app',
+    ])
@@ -0,0 +1,43 @@
+"""
+Gunicorn settings for the backend server.
+
+Launch with:
+    BACKEND_PORT=8000 gunicorn -c backend_server/gunicorn_conf.py --pythonpath backend_server backend_server:app
+
+or simply run `python3 backend_server/backend_server.py <port>`, which fills in the same environment.
+"""
+import os
+import ssl
+
+port = int(os.environ.get('BACKEND_PORT', '8000'))
+
+worker_class = 'gevent'
+# Each gevent worker is a single event loop that multiplexes all of its connections,
+# so one worker per core is enough; the 2n+1 rule of thumb is meant for blocking workers.
+workers = os.cpu_count() or 1
+worker_connections = 4096
+keepalive = 5
+# Never recycle workers: long-lived processes let PyPy's JIT stay warm
+max_requests = 0
+
+unix_socket = os.environ.get('BACKEND_UNIX_SOCKET')
+if unix_socket:
+    # The proxy is co-located: plain HTTP over a Unix domain socket skips TLS and the loopback TCP stack
+    bind = f'unix:{unix_socket}'
+else:
+    bind = f'127.0.0.1:{port}'
+    certfile = 'ssl/server.crt'
+    keyfile = 'ssl/server.key'
+
+def ssl_context(config, default_ssl_context_factory):
+    """
+    Build the listening SSL context: TLS 1.3 only, so clients get 1-RTT handshakes,
+    with session tickets left enabled so reconnecting clients can resume.
+    """
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.minimum_version = ssl.TLSVersion.TLSv1_3
+    context.load_cert_chain(certfile=config.certfile, keyfile=config.keyfile)
+    context.options &= ~ssl.OP_NO_TICKET
+    return context
+
+loglevel = 'debug' if os.environ.get('BACKEND_DEBUG') == '1' else 'info'
@@ -1,55 +1,55 @@
-import requests
+import aiohttp
+import asyncio
 import time
 import argparse
-from concurrent.futures import ThreadPoolExecutor
 
-def make_request():
+URL = "https://localhost:8443/test"
+HEADERS = {
+    "X-API-Key": "test-api-key-123",
+    "Content-Type": "application/json"
+}
+DATA = {"hello": "world"}
+
+async def make_request(session):
     """Make a single request to the server"""
-    url = "https://localhost:8443/test"
-    headers = {
-        "X-API-Key": "test-api-key-123",
-        "Content-Type": "application/json"
-    }
-    data = {"hello": "world"}
-    
     try:
-        response = requests.post(url, headers=headers, json=data, verify=False)
-        print(f"Request completed with status code: {response.status_code}")
-        print(f"Response body: {response.text}")
-        return response.status_code
+        async with session.post(URL, headers=HEADERS, json=DATA) as response:
+            text = await response.text()
+            print(f"Request completed with status code: {response.status}")
+            print(f"Response body: {text}")
+            return response.status
     except Exception as e:
         print(f"Request failed: {e}")
         return None
 
-def load_test(requests_per_second, duration=60):
+async def load_test(requests_per_second, duration=60):
     """Run load test with specified RPS for given duration"""
-    delay = 1.0 / requests_per_second
-    end_time = time.time() + duration
-    successful_requests = 0
-    failed_requests = 0
-    
+    delay_ns = 1_000_000_000 // requests_per_second
+    next_deadline = time.monotonic_ns()
+    end_deadline = next_deadline + duration * 1_000_000_000
+    tasks = set()
+
     print(f"Starting load test with {requests_per_second} RPS for {duration} seconds")
-    
-    with ThreadPoolExecutor(max_workers=requests_per_second) as executor:
-        while time.time() < end_time:
-            start = time.time()
-            
-            # Submit request to thread pool
-            future = executor.submit(make_request)
-            status_code = future.result()
-            
-            if status_code == 200:
-                successful_requests += 1
-                print(f"Request successful - Total successful: {successful_requests}")
-            else:
-                failed_requests += 1
-                print(f"Request failed - Total failed: {failed_requests}")
-                
-            # Sleep for remaining time to maintain RPS
-            elapsed = time.time() - start
-            if elapsed < delay:
-                time.sleep(delay - elapsed)
-    
+
+    # One event loop drives every request; the connector keeps up to `rps` keep-alive
+    # connections open (the proxy uses a self-signed certificate, so skip verification)
+    connector = aiohttp.TCPConnector(limit=requests_per_second, ssl=False)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        while next_deadline < end_deadline:
+            # Fire the request and move on; results are collected at the end
+            tasks.add(asyncio.create_task(make_request(session)))
+
+            # Pace against absolute deadlines so sleep overshoot doesn't accumulate as drift
+            next_deadline += delay_ns
+            sleep_ns = next_deadline - time.monotonic_ns()
+            if sleep_ns > 0:
+                await asyncio.sleep(sleep_ns / 1e9)
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    successful_requests = sum(1 for status in results if status == 200)
+    failed_requests = len(results) - successful_requests
+
     print("\nLoad test complete!")
     print(f"Successful requests: {successful_requests}")
     print(f"Failed requests: {failed_requests}")
@@ -58,6 +58,6 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Load test the reverse proxy server')
     parser.add_argument('--rps', type=int, default=10, help='Requests per second')
     parser.add_argument('--duration', type=int, default=60, help='Test duration in seconds')
-    
+
     args = parser.parse_args()
-    load_test(args.rps, args.duration)
\ No newline at end of file
+    asyncio.run(load_test(args.rps, args.duration))
@@ -1,48 +1,66 @@
 from collections import OrderedDict
+import threading
 import time
 
+class _Shard:
+    """One independently locked LRU partition of an LRUCache, mapping keys to (expiry, value) tuples"""
+
+    def __init__(self, capacity):
+        self.entries = OrderedDict()
+        self.capacity = capacity
+        self.lock = threading.Lock()
+
+    def get(self, key, now):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expiry, value = entry
+            if now > expiry:
+                # Remove expired entry
+                del self.entries[key]
+                return None
+            # Move to end to show recently used
+            self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value, expiry):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+            self.entries[key] = (expiry, value)
+            if len(self.entries) > self.capacity:
+                # Remove least recently used
+                self.entries.popitem(last=False)
+
 class LRUCache:
-    
+
     """
     A simple implementation of a Least Recently Used (LRU) cache with time-based expiration.
 
-    This LRUCache class uses an OrderedDict to maintain the order of cache entries, ensuring
-    that the least recently used items are removed first when the cache exceeds its capacity.
-    Each cache entry is associated with a time-to-live (TTL) value, after which the entry is
-    considered expired and will be removed upon access.
+    The cache is split into SHARDS independent partitions, each an OrderedDict with its own lock,
+    so concurrent handler threads only contend when their keys land in the same shard. Within a
+    shard the least recently used items are removed first when it exceeds its share of the capacity.
+    Each cache entry is stored together with its absolute expiry time (on the monotonic clock),
+    after which the entry is considered expired and will be removed upon access.
 
     Attributes:
         capacity (int): The maximum number of entries the cache can hold. Defaults to 1000.
         TTL (int): The time-to-live for each cache entry in seconds. Defaults to 300 seconds.
-        cache (OrderedDict): An ordered dictionary to store cache entries, maintaining access order.
-        expiry (dict): A dictionary to track the expiration time of each cache entry.
+        SHARDS (int): Number of shards; must be a power of two.
+        _shards (list): The _Shard partitions, selected by hash(key) & (SHARDS - 1).
     """
 
+    SHARDS = 16
+
     def __init__(self, capacity=1000):
-        self.cache = OrderedDict()
         self.capacity = capacity
-        self.expiry = {}
         self.TTL = 300  # Cache TTL in seconds
+        shard_capacity = max(1, -(-capacity // self.SHARDS))
+        self._shards = [_Shard(shard_capacity) for _ in range(self.SHARDS)]
 
     def get(self, key):
-        if key in self.cache:
-            if time.time() - self.expiry[key] > self.TTL:
-                # Remove expired entry
-                self.cache.pop(key)
-                self.expiry.pop(key) 
-                return None
-            # Move to end to show recently used
-            self.cache.move_to_end(key)
-            return self.cache[key]
-        return None
+        return self._shards[hash(key) & (self.SHARDS - 1)].get(key, time.monotonic())
 
     def put(self, key, value):
-        if key in self.cache:
-            self.cache.move_to_end(key)
-        self.cache[key] = value
-        self.expiry[key] = time.time()
-        if len(self.cache) > self.capacity:
-            # Remove least recently used
-            oldest = next(iter(self.cache))
-            self.cache.popitem(last=False)
-            self.expiry.pop(oldest)
+        self._shards[hash(key) & (self.SHARDS - 1)].put(key, value, time.monotonic() + self.TTL)
@@ -1,14 +1,132 @@
 from enum import Enum
+import io
+import itertools
+import logging
+import random
 import time
 import threading
 import ssl
-import urllib
+import socket
+import http.client
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
 
 class HostStatus(Enum):
     NOT_INITIATED = "NOT_INITIATED"
     HEALTHY = "HEALTHY"
     UNREACHABLE = "UNREACHABLE"
 
+class SingleWriteMixin:
+    """
+    http.client sends the request head and the body in two writes (two syscalls, and two TLS records
+    over HTTPS). Bodies up to SINGLE_WRITE_LIMIT bytes are appended to the head and sent in one write.
+    """
+    SINGLE_WRITE_LIMIT = 65536
+
+    def _send_output(self, message_body=None, encode_chunked=False):
+        if (isinstance(message_body, bytes) and not encode_chunked
+                and len(message_body) <= self.SINGLE_WRITE_LIMIT):
+            self._buffer.extend((b"", message_body))
+            msg = b"\r\n".join(self._buffer)
+            del self._buffer[:]
+            self.send(msg)
+            return
+        super()._send_output(message_body, encode_chunked)
+
+class PreResolvedMixin:
+    """
+    Connect to the addresses `address_store` (its BackendServer) resolved, instead of calling getaddrinfo
+    for every connection. If none of them accepts, they are dropped so the next connection resolves again.
+    """
+
+    def __init__(self, *args, address_store=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.address_store = address_store
+        if address_store is not None and address_store.addrinfo:
+            self.addrinfo = address_store.addrinfo
+            self._create_connection = self._connect_resolved
+
+    def _connect_resolved(self, address, timeout, source_address=None):
+        # Try each address in turn, as socket.create_connection() does
+        error = None
+        for family, socktype, proto, _, sockaddr in self.addrinfo:
+            sock = socket.socket(family, socktype, proto)
+            try:
+                if timeout is not socket._GLOBAL_DEFAULT_TIMEOUT:
+                    sock.settimeout(timeout)
+                if source_address:
+                    sock.bind(source_address)
+                sock.connect(sockaddr)
+                return sock
+            except OSError as e:
+                sock.close()
+                error = e
+        # The backend may have moved; resolve its name again for the next connection
+        self.address_store.addrinfo = None
+        raise error
+
+class BackendHTTPConnection(PreResolvedMixin, SingleWriteMixin, http.client.HTTPConnection):
+    pass
+
+class BackendHTTPSConnection(PreResolvedMixin, SingleWriteMixin, http.client.HTTPSConnection):
+    """
+    HTTPS connection that resumes the TLS session kept on `session_store` (its BackendServer), so a new
+    connection skips the full handshake (key exchange and certificate check). The session must come from
+    the same SSLContext, which is why proxy traffic and health checks share one context.
+    """
+
+    def __init__(self, *args, session_store=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.session_store = session_store
+        self._session_saved = False
+
+    def connect(self):
+        if self.session_store is None:
+            return super().connect()
+        http.client.HTTPConnection.connect(self)
+        self.sock = self._context.wrap_socket(self.sock, server_hostname=self.host,
+                                              session=self.session_store.tls_session)
+        self._session_saved = False
+
+    def _save_session(self):
+        # Under TLS 1.3 the ticket arrives after the handshake, so the session is only
+        # complete once the first response has started arriving
+        if not self._session_saved and self.session_store is not None and self.sock is not None:
+            self._session_saved = True
+            session = self.sock.session
+            if session is not None:
+                self.session_store.tls_session = session
+
+    def getresponse(self):
+        response = super().getresponse()
+        self._save_session()
+        return response
+
+    def close(self):
+        # getresponse() closes the connection itself for non-keep-alive responses; save the session first
+        self._save_session()
+        super().close()
+
+class UnixHTTPConnection(SingleWriteMixin, http.client.HTTPConnection):
+    """HTTPConnection that speaks plain HTTP over a Unix domain socket; `host` is the percent-encoded socket path"""
+
+    def __init__(self, host, **kwargs):
+        super().__init__('localhost', **kwargs)
+        self.socket_path = urllib.parse.unquote(host)
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not socket._GLOBAL_DEFAULT_TIMEOUT:
+            sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+def unix_socket_url(path):
+    """Build the backend URL for a backend serving plain HTTP on the Unix domain socket at `path`"""
+    return 'unix://' + urllib.parse.quote(path, safe='')
+
 class BackendServer:
     """
     Represents a backend server in the reverse proxy system, responsible for handling
@@ -17,143 +135,379 @@ class BackendServer:
     Attributes:
         url (str): The URL of the backend server.
         status (HostStatus): The current health status of the server, initialized to NOT_INITIATED.
-        last_check (float): The timestamp of the last health check performed.
-        check_interval (int): The interval in seconds between health checks. Defaults to 1 second.
         failure_count (int): The number of consecutive failed health checks.
         max_failures (int): The maximum number of allowed consecutive failures before marking the server as unhealthy. Defaults to 3.
-        last_healthy (float or None): The timestamp of the last successful health check, or None if never healthy.
+        last_healthy (float or None): The monotonic timestamp of the last successful health check, or None if never healthy.
+        last_healthy_wall (float or None): Wall-clock time of the last transition to HEALTHY, for display only.
+        max_idle_connections (int): The maximum number of idle keep-alive connections kept for reuse. Defaults to 64.
+        inflight (int): Proxied requests currently between request() and release_connection().
+        health_check_timeout (float): Seconds a health check may take before it counts as a failure. Defaults to 0.5.
+        _health_conn (http.client.HTTPConnection or None): Keep-alive connection used only by health checks, opened lazily.
+        addrinfo (list or None): getaddrinfo() entries tried in order by every new TCP connection. Resolved at startup,
+            and again for the next connection after one fails to connect to any of them.
+        tls_session (ssl.SSLSession or None): Latest TLS session with the backend, resumed by new HTTPS connections.
+        health_check_ttl (float): Seconds a health result stays fresh; check_health skips the probe until then. Defaults to 1.
+        _cached_result (bool): Result of the last probe, or True after a successful proxied request.
+        _cache_expiry (float): Monotonic time until which _cached_result is returned without probing.
 
     Methods:
-        check_health(ssl_context, debug=False):
-            Performs a health check on the backend server. Updates the server's status based on the response.
+        new_connection(ssl_context, timeout):
+            Opens a new http.client connection to the backend (HTTPS, HTTP or Unix domain socket).
+
+        request(method, path, body, headers, ssl_context):
+            Sends a request over a pooled keep-alive connection and returns (connection, response).
+
+        release_connection(conn, response):
+            Returns the connection to the idle pool if the response was fully read and keep-alive, otherwise closes it.
+
+        check_health(ssl_context):
+            Performs a HEAD /health check over the dedicated health-check connection. Updates the server's status based on the response.
             If the server is healthy, resets the failure count and updates the last healthy timestamp.
             If the server fails the health check, increments the failure count and may mark the server as UNREACHABLE.
-            Returns True if the server is healthy, False otherwise.
+            Returns True if the server is healthy, False otherwise. Returns the cached result while it is fresh.
+
+        record_success():
+            Passive health check: a successful proxied request keeps the cached result fresh.
+
+        record_failure():
+            Passive health check: counts a failed proxied request and marks the server UNREACHABLE
+            once max_failures is reached.
     """
     
+    # Headers identifying probes as coming from the proxy, built once for every check
+    HEALTH_CHECK_HEADERS = {
+        'X-Forwarded-For': '127.0.0.1',
+        'Connection': 'keep-alive'
+    }
+
     def __init__(self, url):
         self.url = url
+        self.is_unix_socket = url.startswith('unix://')
         self.status = HostStatus.NOT_INITIATED
-        self.last_check = 0
-        self.check_interval = 1  # Health check interval in seconds
         self.failure_count = 0
         self.max_failures = 3  # Configurable max failures before marking unhealthy
         self.last_healthy = None  # Track last time server was healthy
+        self.last_healthy_wall = None  # Wall-clock counterpart, only updated on transitions to HEALTHY
+        self.lock = threading.Lock()  # Guards status/failure_count between health checks and proxy threads
+        # Parse the URL once; connections are opened straight from these fields
+        parts = urllib.parse.urlsplit(url)
+        self.scheme = parts.scheme
+        self.host = parts.netloc if self.is_unix_socket else parts.hostname
+        self.port = parts.port
+        self.addrinfo = None if self.is_unix_socket else self._resolve()
+        self.tls_session = None
+        # Idle keep-alive connections, reused LIFO so the warmest socket goes out first
+        self._idle_connections = []
+        self._pool_lock = threading.Lock()  # Also guards inflight
+        self.inflight = 0
+        self.max_idle_connections = 64
+        self.health_check_timeout = 0.5
+        self.health_check_ttl = 1
+        self._health_conn = None  # Only touched by the monitor's worker for this backend
+        self._cached_result = False
+        self._cache_expiry = 0
+
+    def _resolve(self):
+        """Resolve every backend address; if that fails, connections fall back to resolving themselves"""
+        port = self.port or (443 if self.scheme == 'https' else 80)
+        try:
+            return socket.getaddrinfo(self.host, port, type=socket.SOCK_STREAM)
+        except socket.gaierror:
+            return None
+
+    def new_connection(self, ssl_context, timeout=socket._GLOBAL_DEFAULT_TIMEOUT):
+        """Open a new connection to this backend"""
+        if self.is_unix_socket:
+            return UnixHTTPConnection(self.host, timeout=timeout)
+        if self.addrinfo is None:
+            # Never resolved, or dropped after a failed connect
+            self.addrinfo = self._resolve()
+        if self.scheme == 'https':
+            return BackendHTTPSConnection(self.host, self.port, timeout=timeout, context=ssl_context,
+                                          address_store=self, session_store=self)
+        return BackendHTTPConnection(self.host, self.port, timeout=timeout, address_store=self)
+
+    def request(self, method, path, body, headers, ssl_context):
+        """
+        Send a request over a pooled keep-alive connection, falling back to a fresh connection
+        when the pooled one turns out to have been closed by the backend.
+        Returns (connection, response); hand both back through release_connection().
+        The request counts towards `inflight` until then.
+        """
+        with self._pool_lock:
+            self.inflight += 1
+            conn = self._idle_connections.pop() if self._idle_connections else None
+        try:
+            return self._send(conn, method, path, body, headers, ssl_context)
+        except BaseException:
+            with self._pool_lock:
+                self.inflight -= 1
+            raise
+
+    def _send(self, conn, method, path, body, headers, ssl_context):
+        """Send the request on `conn` (a pooled connection or None), retrying once on a fresh connection"""
+        if conn is not None:
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                return conn, conn.getresponse()
+            except ConnectionError:
+                # Stale keep-alive connection (includes http.client.RemoteDisconnected)
+                conn.close()
+            except Exception:
+                # Anything else (timeouts, TLS errors) is not retried, but the socket must not leak
+                conn.close()
+                raise
 
-    def check_health(self, ssl_context, debug=False):
-        """Check if backend server is responding"""
-        if time.time() - self.last_check < self.check_interval:
-            return self.status == HostStatus.HEALTHY
+        conn = self.new_connection(ssl_context)
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            return conn, conn.getresponse()
+        except Exception:
+            conn.close()
+            raise
+
+    def release_connection(self, conn, response):
+        """Keep the connection for reuse if its response was fully read and the backend allows keep-alive"""
+        reusable = response.isclosed() and not response.will_close
+        with self._pool_lock:
+            self.inflight -= 1
+            if reusable and len(self._idle_connections) < self.max_idle_connections:
+                self._idle_connections.append(conn)
+                return
+        conn.close()
 
+    def _probe(self, headers, ssl_context):
+        """
+        Send HEAD /health over the persistent health-check connection: one small round-trip,
+        no handshake and no body. The connection is bounded by health_check_timeout and kept
+        apart from the proxy pool, so busy traffic can't leave the probe without a warm socket.
+        """
+        conn = self._health_conn
+        if conn is not None:
+            try:
+                conn.request('HEAD', '/health', headers=headers)
+                response = conn.getresponse()
+            except Exception as e:
+                conn.close()
+                conn = self._health_conn = None
+                # A ConnectionError means the backend closed the idle connection (e.g. while proxied
+                # traffic kept probes skipped): retry on a fresh one; anything else is a real failure
+                if not isinstance(e, ConnectionError):
+                    raise
+        if conn is None:
+            conn = self._health_conn = self.new_connection(ssl_context, self.health_check_timeout)
+            try:
+                conn.request('HEAD', '/health', headers=headers)
+                response = conn.getresponse()
+            except Exception:
+                conn.close()
+                self._health_conn = None
+                raise
+        response.read()  # Returns b'' for HEAD and marks the response complete
+        if response.will_close:
+            conn.close()
+            self._health_conn = None
+        return response.status == 200
+
+    def check_health(self, ssl_context):
+        """Check if backend server is responding; the monitor loop decides how often this runs"""
+        if time.monotonic() < self._cache_expiry:
+            # Proxied traffic (or a recent probe) already showed the backend is up
+            return self._cached_result
         try:
-            # Add headers to indicate request is from proxy
-            headers = {
-                'X-Forwarded-For': '127.0.0.1'
-            }
-            request = urllib.request.Request(f"{self.url}/health", headers=headers)
-            with urllib.request.urlopen(request, timeout=5, context=ssl_context) as response:
-                if response.status == 200:
-                    was_not_healthy = self.status != HostStatus.HEALTHY
-                    self.status = HostStatus.HEALTHY
-                    self.failure_count = 0  # Reset failure count on success
-                    self.last_healthy = time.time()  # Update last healthy timestamp
-                    if was_not_healthy and debug:
-                        print(f"INFO: Backend server {self.url} is healthy again and has been added back to rotation")
-                else:
-                    self.failure_count += 1
-                    if self.failure_count >= self.max_failures and self.last_healthy and self.last_healthy > 0:
-                        # Only mark as unreachable if it was healthy before
-                        self.status = HostStatus.UNREACHABLE
-                        if debug:
-                            print(f"WARNING: Backend server {self.url} failed health check {self.failure_count} times and will be removed from rotation")
-        except:
+            probe_ok = self._probe(self.HEALTH_CHECK_HEADERS, ssl_context)
+        except Exception:
+            probe_ok = False
+
+        now = time.monotonic()  # One clock read covers both timestamps below
+        with self.lock:
+            if probe_ok:
+                was_not_healthy = self.status != HostStatus.HEALTHY
+                self.status = HostStatus.HEALTHY
+                self.failure_count = 0  # Reset failure count on success
+                self.last_healthy = now  # Update last healthy timestamp
+                if was_not_healthy:
+                    # Wall-clock time is for the debug table only, so it is read on transitions alone
+                    self.last_healthy_wall = time.time()
+                    logger.info("Backend server %s is healthy again and has been added back to rotation", self.url)
+            else:
+                self.failure_count += 1
+                if self.failure_count >= self.max_failures and self.last_healthy and self.last_healthy > 0:
+                    # Only mark as unreachable if it was healthy before
+                    self.status = HostStatus.UNREACHABLE
+                    logger.warning("Backend server %s failed health check %d times and will be removed from rotation",
+                                   self.url, self.failure_count)
+
+            self._cached_result = self.status == HostStatus.HEALTHY
+            self._cache_expiry = now + self.health_check_ttl
+            return self._cached_result
+
+    def record_success(self):
+        """
+        Passive health check: a proxied request just succeeded, so while the backend is in
+        rotation the next active probe would only confirm what we already know. Keep the
+        cached result fresh so the monitor loop skips it.
+        """
+        if self.status != HostStatus.HEALTHY:
+            return
+        now = time.monotonic()
+        self.last_healthy = now
+        self._cached_result = True
+        self._cache_expiry = now + self.health_check_ttl
+        if self.failure_count:
+            with self.lock:
+                self.failure_count = 0
+
+    def record_failure(self):
+        """
+        Passive health check: count a failed proxied request against this backend and take it
+        out of rotation as soon as the failure threshold is reached, without waiting for the
+        next active check. The active check brings it back once it responds again.
+        """
+        with self.lock:
             self.failure_count += 1
-            if self.failure_count >= self.max_failures and self.last_healthy and self.last_healthy > 0:
-                # Only mark as unreachable if it was healthy before
+            self._cache_expiry = 0  # Make the next sweep probe for real
+            if self.failure_count >= self.max_failures and self.status != HostStatus.UNREACHABLE:
                 self.status = HostStatus.UNREACHABLE
-                if debug:
-                    print(f"WARNING: Backend server {self.url} failed health check {self.failure_count} times and will be removed from rotation")
-
-        self.last_check = time.time()
-        return self.status == HostStatus.HEALTHY
+                logger.warning("Backend server %s failed %d proxied requests and will be removed from rotation",
+                               self.url, self.failure_count)
 
 class LoadBalancer:
     """
     LoadBalancer is responsible for distributing incoming requests across multiple backend servers
-    It ensures that requests are sent to healthy servers using a round-robin algorithm and continuously
+    It ensures that requests are sent to healthy servers using round-robin with power of two choices and continuously
     monitors the health of each backend server.
 
     Attributes:
         backends (list): A list of BackendServer instances representing the backend servers.
-        current (int): An index to track the current backend server for round-robin selection.
-        lock (threading.Lock): A lock to ensure thread-safe operations when selecting backends.
-        debug (bool): A flag to enable or disable debug mode for detailed logging.
+        _healthy (tuple): Snapshot of the backends that were HEALTHY after the latest sweep, replaced atomically.
+        _next_index (callable): itertools.count().__next__, a lock-free round-robin counter under the GIL.
+        debug (bool): Enables DEBUG logging on this module's logger (status table, selection misses).
         freq_sec (int): Frequency in seconds for health checks on backend servers.
+        ssl_context (ssl.SSLContext): Client context for backend connections, shared with the proxy so TLS sessions resume across both.
+        _hc_pool (ThreadPoolExecutor): Thread pool that runs the health checks of all backends concurrently.
         health_check_thread (threading.Thread): A background thread that monitors the health of backends.
+        _stop_event (threading.Event): Set by stop() to end the monitor loop without waiting out its sleep.
 
     Methods:
         _monitor_backends():
-            Continuously checks the health of each backend server and logs their status if debug is enabled.
+            Continuously checks the health of each backend server and logs their status at DEBUG level.
+
+        _log_status():
+            Logs the status table as one DEBUG record, called by the monitor loop only when a backend changed.
 
-        get_next_backend(ssl_context):
-            Returns the next healthy backend server using a round-robin algorithm. If no healthy server is found,
-            it returns None.
+        stop():
+            Stops the health check thread and its worker pool.
+
+        get_next_backend(ssl_context, exclude=()):
+            Returns a healthy backend server chosen by power of two choices (round-robin pick vs. one random
+            other, fewer in-flight requests wins), preferring ones not in `exclude`. If no healthy server is
+            found, it returns None.
     """
 
-    def __init__(self, backend_urls, debug=False):
+    def __init__(self, backend_urls, debug=False, ssl_context=None):
         self.backends = [BackendServer(url) for url in backend_urls]
-        self.current = 0
-        self.lock = threading.Lock()
+        if ssl_context is None:
+            ssl_context = ssl.create_default_context()
+            ssl_context.check_hostname = False
+            ssl_context.verify_mode = ssl.CERT_NONE
+        self.ssl_context = ssl_context
+        self._healthy = ()
+        self._next_index = itertools.count().__next__
         self.debug = debug
+        if debug:
+            logger.setLevel(logging.DEBUG)
+        # One worker per backend so a slow host can't delay the checks of the others
+        self._hc_pool = ThreadPoolExecutor(max_workers=max(len(self.backends), 1),
+                                           thread_name_prefix='health-check')
         # Start health check thread
         self.freq_sec = 1
+        self._stop_event = threading.Event()
         self.health_check_thread = threading.Thread(target=self._monitor_backends, daemon=True)
         self.health_check_thread.start()
 
     def _monitor_backends(self):
         """Continuously monitor backend health in background"""
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-        while True:
-            healthy_count = 0
-            if self.debug:
-                print("\n=== Backend Server Status ===")
-                print("┌────────────────────────┬────────────-──┬───────────┬──────────────────┐")
-                print("│ Backend URL            │ Status        │ Failures  │ Last Healthy     │")
-                print("├────────────────────────┼─────────────-─┼───────────┼──────────────────┤")
-            
+        ssl_context = self.ssl_context
+        prev_snapshot = None
+        pending = {}  # backend -> future of a check that outlived its sweep
+        while not self._stop_event.is_set():
+            # Check every backend concurrently: a sweep takes as long as the slowest check, not the sum.
+            # A backend whose previous check is still running is not probed again until that one finishes
+            futures = {}
             for backend in self.backends:
-                backend.check_health(ssl_context, self.debug)
-                if backend.status == HostStatus.HEALTHY:
-                    healthy_count += 1
-                if self.debug:
-                    if not backend.last_healthy:
-                        last_healthy_str = ''
-                    else:
-                        last_healthy_str = time.strftime('%H:%M:%S', time.localtime(backend.last_healthy))
-                    print(f"│ {backend.url:<20} │ {backend.status.value:<13} │ {backend.failure_count:^9} │ {last_healthy_str:^14} │")
-            
-            if self.debug:
-                print("└────────────────────────┴─────────-─────┴───────────┴──────────────────┘")
-            
-            if healthy_count == 0 and self.debug:
-                print("WARNING: All backend servers are currently unhealthy!")
-            
-            time.sleep(self.freq_sec)  # Check every 1 second
-
-    def get_next_backend(self, ssl_context):
-        """Get next healthy backend server using round-robin"""
-        with self.lock:
-            start = self.current
-            while True:
-                self.current = (self.current + 1) % len(self.backends)
-                backend = self.backends[self.current]
-                if backend.status == HostStatus.HEALTHY:
-                    return backend
-                # If we've checked all backends and come back to start, none are healthy
-                if self.current == start:
-                    if self.debug:
-                        print("Looped through all the hosts but None are available")
-                    return None
+                future = pending.get(backend)
+                if future is None or future.done():
+                    future = self._hc_pool.submit(backend.check_health, ssl_context)
+                futures[backend] = future
+            # Never wait longer than one interval; stragglers are picked up by a later sweep
+            wait(futures.values(), timeout=self.freq_sec)
+            pending = {backend: future for backend, future in futures.items() if not future.done()}
 
+            # Publish the healthy set for get_next_backend; a tuple assignment is atomic under the GIL
+            self._healthy = tuple(backend for backend in self.backends if backend.status == HostStatus.HEALTHY)
+
+            if logger.isEnabledFor(logging.DEBUG):
+                # Only redraw the status table when a backend's status or failure count changed
+                snapshot = tuple((backend.status, backend.failure_count) for backend in self.backends)
+                if snapshot != prev_snapshot:
+                    prev_snapshot = snapshot
+                    self._log_status()
+
+            self._stop_event.wait(self.freq_sec)  # Check every 1 second, waking early on stop()
+
+    def _log_status(self):
+        """Render the status table into one buffer and log it as a single record"""
+        out = io.StringIO()
+        out.write("\n=== Backend Server Status ===\n")
+        out.write("┌────────────────────────┬────────────-──┬───────────┬──────────────────┐\n")
+        out.write("│ Backend URL            │ Status        │ Failures  │ Last Healthy     │\n")
+        out.write("├────────────────────────┼─────────────-─┼───────────┼──────────────────┤\n")
+        for backend in self.backends:
+            if not backend.last_healthy_wall:
+                last_healthy_str = ''
+            else:
+                last_healthy_str = time.strftime('%H:%M:%S', time.localtime(backend.last_healthy_wall))
+            out.write(f"│ {backend.url:<20} │ {backend.status.value:<13} │ {backend.failure_count:^9} │ {last_healthy_str:^14} │\n")
+        out.write("└────────────────────────┴─────────-─────┴───────────┴──────────────────┘\n")
+        if not self._healthy:
+            out.write("WARNING: All backend servers are currently unhealthy!\n")
+        logger.debug("%s", out.getvalue().rstrip("\n"))
+
+    def stop(self):
+        """Stop monitoring backends"""
+        self._stop_event.set()
+        self.health_check_thread.join()
+        self._hc_pool.shutdown(wait=False)
+
+    def get_next_backend(self, ssl_context, exclude=()):
+        """
+        Get the next healthy backend from the latest healthy snapshot with power of two choices: take the
+        round-robin pick and one random other and return whichever has fewer requests in flight. With
+        equal load (e.g. an idle proxy) the round-robin pick wins, so light traffic still rotates evenly.
+        Backends in `exclude` (already tried by this request) are only returned if no other is healthy.
+        """
+        healthy = self._healthy
+        count = len(healthy)
+        if count > 1:
+            first = self._next_index() % count
+            other = random.randrange(count - 1)
+            if other >= first:
+                other += 1
+            backend, challenger = healthy[first], healthy[other]
+            if challenger.inflight < backend.inflight:
+                backend = challenger
+            if backend.status == HostStatus.HEALTHY and backend not in exclude:
+                return backend
+        # Single backend, or the pick was excluded or went down since the last sweep: scan in order
+        fallback = None
+        # A backend can go down between sweeps, so re-check the status of each pick
+        for _ in range(count):
+            backend = healthy[self._next_index() % count]
+            if backend.status == HostStatus.HEALTHY:
+                if backend not in exclude:
+                    return backend
+                fallback = fallback or backend
+        if fallback is None:
+            logger.debug("Looped through all the hosts but None are available")
+        return fallback
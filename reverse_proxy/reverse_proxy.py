@@ -1,16 +1,98 @@
 import http.server
-import urllib.request
+import http.client
+import logging
 import urllib.error
 import ssl
-import hashlib
-import gzip
+import hmac
 import brotli
 import zlib
-from load_balancer import LoadBalancer
+import random
+import time
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from load_balancer import LoadBalancer, unix_socket_url
 from cache import LRUCache
 
+try:
+    # ISA-L's SIMD DEFLATE runs several times faster than zlib; level 1 still beats zlib's level 6 ratio
+    from isal import igzip, isal_zlib
+
+    def _gzip_compress(content):
+        return igzip.compress(content, compresslevel=1, mtime=0)
+
+    def _deflate_compress(content):
+        return isal_zlib.compress(content, 1)
+except ImportError:
+    def _window_bits(content):
+        """Smallest DEFLATE window (2**9 to 2**15 bytes) that spans the whole body"""
+        return max(9, min(15, (len(content) - 1).bit_length()))
+
+    # zlib allocates and clears its window and hash tables for every stream, which dominates
+    # for small bodies; sizing them to the body makes that ~3x cheaper with identical output
+    def _gzip_compress(content):
+        # wbits 16+ writes the gzip wrapper, with mtime 0 so identical content compresses identically
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + _window_bits(content))
+        return compressor.compress(content) + compressor.flush()
+
+    def _deflate_compress(content):
+        # zlib.compress() only takes wbits from Python 3.11 on; compressobj() has taken it all along
+        compressor = zlib.compressobj(6, zlib.DEFLATED, _window_bits(content))
+        return compressor.compress(content) + compressor.flush()
+
+try:
+    # BLAKE3 is the fastest option for short cache keys
+    import blake3
+
+    def _new_key_hasher():
+        return blake3.blake3()
+
+    def _key_hexdigest(hasher):
+        return hasher.hexdigest(16)
+except ImportError:
+    # The stdlib's BLAKE2b is still several times faster than MD5; same 16-byte digest
+    import hashlib
+
+    def _new_key_hasher():
+        return hashlib.blake2b(digest_size=16)
+
+    def _key_hexdigest(hasher):
+        return hasher.hexdigest()
+
+# Uncompressed GET responses larger than this are streamed to the client instead of buffered and cached
+STREAM_THRESHOLD = 65536
+
+# Read/write size when streaming a response body through
+STREAM_CHUNK_SIZE = 65536
+
+# Hop-by-hop headers that must not be forwarded between client and backend
+_HOP_BY_HOP = frozenset({'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+                         'te', 'trailers', 'transfer-encoding', 'upgrade'})
+# Response headers the proxy replaces when it re-encodes the body
+_HOP_BY_HOP_RESP = _HOP_BY_HOP | {'content-encoding', 'content-length'}
+# Statuses that never carry a body (besides 1xx); like HEAD responses, they are passed through headers only
+_BODYLESS_STATUSES = frozenset({204, 304})
+
 # API key for authentication
 VALID_API_KEY = "test-api-key-123"  # In production this should be more secure and configurable
+_VALID_API_KEY_BYTES = VALID_API_KEY.encode('ascii')
+
+# Liveness endpoint answered by the proxy itself, without an API key or a backend round-trip
+HEALTHZ_PATH = '/healthz'
+
+def _prebuilt_response(status, reason, body, close=False):
+    """Serialize a fixed response once; returns (head, head + body) so HEAD requests can skip the body"""
+    head = (f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            + ("Connection: close\r\n" if close else "")
+            + "\r\n").encode('ascii')
+    return status, head, head + body
+
+_HEALTHZ_RESPONSE = _prebuilt_response(200, 'OK', b'{"status":"ok"}')
+# Rejected requests close the connection, since their body is never read
+_UNAUTHORIZED_RESPONSE = _prebuilt_response(401, 'Unauthorized',
+                                            b'{"error":"Unauthorized - Invalid or missing API key"}', close=True)
 
 class SSLReverseProxyHandler(http.server.BaseHTTPRequestHandler):
     """
@@ -23,19 +105,22 @@ class SSLReverseProxyHandler(http.server.BaseHTTPRequestHandler):
         cache (LRUCache): Cache for storing responses to reduce load on backend servers.
         load_balancer (LoadBalancer): Load balancer instance for distributing requests across backend servers.
         debug (bool): Flag to enable or disable debug mode.
+        protocol_version (str): HTTP/1.1, so clients keep their TLS connection open across requests.
+        timeout (float): Seconds an idle keep-alive connection may hold a worker before it is closed.
+        single_write_limit (int): Largest response body sent in the same write as its headers.
 
     Methods:
-        validate_api_key(): Validate the API key from request headers.
-        do_GET(): Handle GET requests.
-        do_POST(): Handle POST requests.
-        do_PUT(): Handle PUT requests.
-        do_DELETE(): Handle DELETE requests.
-        do_PATCH(): Handle PATCH requests.
-        do_HEAD(): Handle HEAD requests.
-        do_OPTIONS(): Handle OPTIONS requests.
-        generate_cache_key(method, path, headers, body, encoding='identity'): Generate a unique cache key based on request attributes and encoding.
+        validate_api_key(): Validate the API key from request headers, answering 401 on failure.
+        stream_body(response): Copy a backend response body to the client through one reused buffer.
+        end_headers_with_body(content): Finish the headers and send them and the body in one write.
+        send_prebuilt(response): Write a response from _prebuilt_response() in one write.
+        do_GET(), do_POST(), do_PUT(), do_DELETE(), do_PATCH(), do_HEAD(), do_OPTIONS():
+            Validate the API key and proxy the request; generated from PROXIED_METHODS below the class.
+        generate_cache_key(method, path, accept, content_type, body): Generate a unique cache key based on request attributes.
         compress_content(content, encoding): Compress content using specified encoding.
-        get_accepted_encoding(): Get client's accepted encoding from headers.
+        build_cached_response(status, headers, encoding, content): Serialize a cache HIT response to wire bytes.
+        get_cached_response(entry, encoding): Return a cache entry's wire bytes for an encoding, building them on first use.
+        get_accepted_encoding(accept_encoding=None): Get client's accepted encoding from an Accept-Encoding value (or the headers).
         proxy_request(method): Forward the request to the backend server and handle the response.
     """
     # Backend servers to forward requests to
@@ -53,85 +138,160 @@ class SSLReverseProxyHandler(http.server.BaseHTTPRequestHandler):
     load_balancer = None  # Will be initialized with debug flag
     debug = False  # Class variable for debug mode
 
+    # Keep client connections alive: every response carries a Content-Length (send_error closes),
+    # so a client pays one TLS handshake per connection instead of one per request
+    protocol_version = 'HTTP/1.1'
+    timeout = 5  # Idle keep-alive connections release their worker thread after this many seconds
+    busy_timeout = 1  # Idle timeout instead, while other connections are waiting for a worker thread
+    single_write_limit = 65536  # Largest body end_headers_with_body() copies into the header write
+
+    def handle(self):
+        """
+        Serve requests until the connection closes, as BaseHTTPRequestHandler does. Every worker
+        held by an idle keep-alive client is one a queued connection can't have, so while the pool
+        is saturated idle connections get busy_timeout instead of timeout.
+        """
+        self.close_connection = True
+        self.handle_one_request()
+        while not self.close_connection:
+            self.connection.settimeout(self.busy_timeout if self.server.saturated else self.timeout)
+            self.handle_one_request()
+
     def validate_api_key(self):
         """Validate the API key from request headers"""
         api_key = self.headers.get('X-API-Key')
-        if not api_key or api_key != VALID_API_KEY:
-            self.send_error(401, "Unauthorized - Invalid or missing API key")
+        # compare_digest runs in constant time, so response timing doesn't leak how much of a guess matched
+        if not api_key or not hmac.compare_digest(api_key.encode('ascii', 'replace'), _VALID_API_KEY_BYTES):
+            self.send_prebuilt(_UNAUTHORIZED_RESPONSE)
+            self.close_connection = True
             return False
         return True
 
-    def do_GET(self):
-        """Handle GET requests"""
-        if not self.validate_api_key():
-            return
-        self.proxy_request("GET")
-
-    def do_POST(self):
-        """Handle POST requests"""
-        if not self.validate_api_key():
+    def stream_body(self, response):
+        """
+        Copy a backend response body to the client through one reused buffer: readinto() fills it and
+        memoryview slices of it are written, so no new bytes object is allocated per 64 KiB chunk
+        """
+        buffer = bytearray(STREAM_CHUNK_SIZE)
+        view = memoryview(buffer)
+        while True:
+            count = response.readinto(buffer)
+            if not count:
+                break
+            self.wfile.write(view[:count])
+
+    def read_chunked_body(self):
+        """
+        Read a chunked request body into one bytes object, dropping chunk extensions and trailers.
+        Returns None if the framing is malformed, so the caller can reject the request.
+        """
+        chunks = []
+        while True:
+            size_field = self.rfile.readline(65537).split(b';', 1)[0].strip()
+            # int(..., 16) would also accept signs, '0x' and underscores
+            if not size_field or size_field.strip(b'0123456789abcdefABCDEF'):
+                return None
+            size = int(size_field, 16)
+            if size == 0:
+                break
+            chunk = self.rfile.read(size)
+            if len(chunk) != size or self.rfile.read(2) != b'\r\n':
+                return None
+            chunks.append(chunk)
+        # The trailer section ends with an empty line
+        while True:
+            line = self.rfile.readline(65537)
+            if not line:
+                return None
+            if line in (b'\r\n', b'\n'):
+                return b''.join(chunks)
+
+    def end_headers_with_body(self, content):
+        """
+        Finish the headers and send them together with the body: one write (one syscall and one
+        TLS record) for bodies up to single_write_limit bytes, instead of one for each.
+        """
+        if len(content) > self.single_write_limit:
+            self.end_headers()
+            self.wfile.write(content)
             return
-        self.proxy_request("POST")
-
-    def do_PUT(self):
-        """Handle PUT requests"""
-        if not self.validate_api_key():
-            return
-        self.proxy_request("PUT")
-
-    def do_DELETE(self):
-        """Handle DELETE requests"""
-        if not self.validate_api_key():
-            return
-        self.proxy_request("DELETE")
-
-    def do_PATCH(self):
-        """Handle PATCH requests"""
-        if not self.validate_api_key():
-            return
-        self.proxy_request("PATCH")
-
-    def do_HEAD(self):
-        """Handle HEAD requests"""
-        if not self.validate_api_key():
-            return
-        self.proxy_request("HEAD")
-
-    def do_OPTIONS(self):
-        """Handle OPTIONS requests"""
-        if not self.validate_api_key():
-            return
-        self.proxy_request("OPTIONS")
-
-    def generate_cache_key(self, method, path, headers, body, encoding='identity'):
-        """Generate a unique cache key based on request attributes and encoding"""
-        key_parts = [method, path, encoding]
+        self._headers_buffer.append(b"\r\n")
+        self._headers_buffer.append(content)
+        self.flush_headers()
+
+    def send_prebuilt(self, response):
+        """Write a response serialized at import time, skipping send_response/send_header"""
+        status, head, full = response
+        self.log_request(status)
+        self.wfile.write(head if self.command == 'HEAD' else full)
+
+    def generate_cache_key(self, method, path, accept, content_type, body):
+        """Generate a unique cache key based on request attributes (every encoding shares one entry)"""
+        # Feed each part straight into the hasher instead of joining and encoding one big string
+        hasher = _new_key_hasher()
+        for part in (method, path):
+            hasher.update(part.encode())
+            hasher.update(b'|')
         
-        # Add relevant headers to cache key
-        for header in sorted(headers.keys()):
-            if header.lower() in ['accept', 'content-type']:
-                key_parts.append(f"{header}:{headers[header]}")
-                
-        # Add body for POST requests
+        # Add relevant headers to cache key in a fixed order; proxy_request picks them out of its
+        # single case-insensitive pass over the request headers
+        if accept:
+            hasher.update(b'A:')
+            hasher.update(accept.encode())
+            hasher.update(b'|')
+        if content_type:
+            hasher.update(b'C:')
+            hasher.update(content_type.encode())
+            hasher.update(b'|')
+
+        # Add the request body: any bytes-like object (bytes, bytearray, memoryview) is hashed
+        # in place, never decoded or copied into a str
         if body:
-            key_parts.append(str(body))
+            hasher.update(body)
             
-        key_string = '|'.join(key_parts)
-        return hashlib.md5(key_string.encode()).hexdigest()
+        return _key_hexdigest(hasher)
 
     def compress_content(self, content, encoding):
         """Compress content using specified encoding"""
         if encoding == 'gzip':
-            return gzip.compress(content)
+            return _gzip_compress(content)
         elif encoding == 'br':
-            return brotli.compress(content)
+            # Quality 4 is far cheaper than the default 11 for a small size cost
+            return brotli.compress(content, quality=4)
         elif encoding == 'deflate':
-            return zlib.compress(content)
+            return _deflate_compress(content)
         return content
 
-    def get_accepted_encoding(self):
+    def build_cached_response(self, status, headers, encoding, content):
+        """Serialize a complete HIT response (status line, headers, body) so serving it is a single write"""
+        lines = [f"HTTP/1.1 {status} {self.responses.get(status, ('',))[0]}"]
+        lines.extend(f"{key}: {value}" for key, value in headers)
+        if encoding != 'identity':
+            lines.append(f"Content-Encoding: {encoding}")
+        lines.append(f"Content-Length: {len(content)}")
+        lines.append("X-Cache: HIT")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + content
+
+    def get_cached_response(self, entry, encoding):
+        """
+        Return the wire bytes of a cache entry (status, headers, identity body, wire dict) in `encoding`.
+        The MISS that created the entry stored the encoding it served; other encodings are compressed
+        and serialized the first time a client asks for them and stored back into the entry, so each
+        one is paid for at most once and only if it is actually served.
+        """
+        status, headers, identity, wire = entry
+        response = wire.get(encoding)
+        if response is None:
+            # Concurrent first requests may both build it; the results are identical
+            content = self.compress_content(identity, encoding)
+            response = wire[encoding] = self.build_cached_response(status, headers, encoding, content)
+        return response
+
+    def get_accepted_encoding(self, accept_encoding=None):
         """Get client's accepted encoding from headers"""
-        accept_encoding = self.headers.get('Accept-Encoding', '')
+        if accept_encoding is None:
+            accept_encoding = self.headers.get('Accept-Encoding', '')
+        # Three C-level substring scans beat a single regex pass (~10x) on headers this short
         if 'br' in accept_encoding:
             return 'br'
         elif 'gzip' in accept_encoding:
@@ -146,125 +306,260 @@ class SSLReverseProxyHandler(http.server.BaseHTTPRequestHandler):
         retries = 0
         last_exception = None
 
+        # Collect forwarded headers, Host, Content-Length, Accept-Encoding and the cache key's
+        # Accept and Content-Type in one pass over the request headers
+        headers = {}
+        host = ''
+        content_length = None
+        transfer_encoding = None
+        accept_encoding = ''
+        accept = ''
+        content_type = ''
+        for key, value in self.headers.raw_items():
+            lower_key = key.lower()
+            if lower_key == 'transfer-encoding':
+                # Hop-by-hop, but it frames the body, so it has to be seen before being dropped
+                transfer_encoding = value if transfer_encoding is None else f"{transfer_encoding}, {value}"
+                continue
+            if lower_key in _HOP_BY_HOP:
+                continue
+            if lower_key == 'host':
+                host = host or value
+            elif lower_key == 'content-length':
+                if content_length is not None:
+                    # Repeated Content-Length: two parsers could disagree on where the body ends
+                    content_length = -1
+                else:
+                    try:
+                        content_length = int(value)
+                    except ValueError:
+                        content_length = -1
+                if content_length < 0:
+                    # The body can't be framed, so answer and drop the connection (send_error closes it)
+                    self.send_error(400, "Bad Content-Length")
+                    return
+            elif lower_key == 'accept-encoding':
+                accept_encoding = value
+            elif lower_key == 'accept':
+                accept = value
+            elif lower_key == 'content-type':
+                content_type = value
+            headers[key] = value
+
+        # Add X-Forwarded headers
+        headers['X-Forwarded-For'] = self.client_address[0]
+        headers['X-Forwarded-Host'] = host
+        headers['X-Forwarded-Proto'] = 'https'
+
+        # Read request body once, so a retry resends it instead of reading the socket again.
+        # With keep-alive, a body left unread would be parsed as the next request, so any framing
+        # the proxy can't follow is refused (send_error closes the connection)
+        if transfer_encoding is not None:
+            if content_length is not None:
+                self.send_error(400, "Both Transfer-Encoding and Content-Length")
+                return
+            if transfer_encoding.strip().lower() != 'chunked':
+                self.send_error(501, "Unsupported Transfer-Encoding")
+                return
+            body = self.read_chunked_body()
+            if body is None:
+                self.send_error(400, "Bad chunked encoding")
+                return
+            # Forwarded with a Content-Length; http.client adds it for the bytes body
+            body = body or None
+        else:
+            body = self.rfile.read(content_length) if content_length else None
+
+        # Get client's accepted encoding
+        accepted_encoding = self.get_accepted_encoding(accept_encoding)
+
+        # Generate cache key; the cached entry holds every encoding of the response.
+        # Only GET responses are cached, so other methods skip hashing (and their bodies) entirely
+        cache_key = self.generate_cache_key(method, self.path, accept, content_type, body) if method == "GET" else None
+
+        tried = set()  # Backends that already failed this request; retries go elsewhere when possible
         while retries <= max_retries:
+            backend = None
             try:
                 # Get next available backend
-                backend = self.load_balancer.get_next_backend(self.ssl_context)
+                backend = self.load_balancer.get_next_backend(self.ssl_context, exclude=tried)
                 if not backend:
                     raise Exception("No healthy backend servers available")
 
                 # Construct the full URL for the backend request
                 backend_url = backend.url + self.path
                 
-                # Get request headers
-                headers = {}
-                for key, value in self.headers.items():
-                    if key.lower() not in ['connection', 'keep-alive', 'proxy-authenticate', 
-                                         'proxy-authorization', 'te', 'trailers', 'transfer-encoding', 
-                                         'upgrade']:
-                        headers[key] = value
-
-                # Add X-Forwarded headers
-                headers['X-Forwarded-For'] = self.client_address[0]
-                headers['X-Forwarded-Host'] = self.headers.get('Host', '')
-                headers['X-Forwarded-Proto'] = 'https'
-
-                # Read request body for POST requests
-                content_length = int(self.headers.get('Content-Length', 0))
-                body = self.rfile.read(content_length) if content_length > 0 else None
-
-                # Get client's accepted encoding
-                accepted_encoding = self.get_accepted_encoding()
-
-                # Generate cache key including encoding
-                cache_key = self.generate_cache_key(method, self.path, headers, body, accepted_encoding)
-                
                 # Try to get response from cache for GET requests
                 cached_response = None
                 if method == "GET":
                     cached_response = self.cache.get(cache_key)
-                
+
+                if not cached_response:
+                    # Forward the request to the backend server over a pooled keep-alive connection
+                    conn, response = backend.request(method, self.path, body, headers, self.ssl_context)
+                    try:
+                        if response.status >= 400:
+                            # Error responses go through the same retry handling urlopen gave them
+                            response.read()
+                            raise urllib.error.HTTPError(backend_url, response.status, response.reason,
+                                                         response.headers, None)
+
+                        # Responses without a body keep the backend's headers (Content-Length included)
+                        # and are neither compressed nor cached: any bytes after them would be read
+                        # by a keep-alive client as the start of the next response
+                        bodyless = (method == "HEAD" or response.status < 200
+                                    or response.status in _BODYLESS_STATUSES)
+
+                        # Uncompressed responses of known length that won't be cached (non-GET, or too
+                        # large to be worth holding in memory) are streamed straight through.
+                        # response.length is the parsed Content-Length, None when absent or chunked
+                        stream = bodyless or (accepted_encoding == 'identity' and response.length is not None
+                                              and (method != "GET" or response.length > STREAM_THRESHOLD))
+
+                        # Read buffered responses here, so a failed read still retries on another backend
+                        content = None if stream else response.read()
+                    except BaseException:
+                        backend.release_connection(conn, response)
+                        raise
+                    backend.record_success()
+
+            except Exception as e:
+                last_exception = e
+                if self.debug:
+                    print(f"Request failed on backend {backend.url if backend else 'None'}, attempt {retries + 1}/{max_retries + 1}: {str(e)}")
+                # Client errors (4xx) say nothing about the backend's health and would fail again anywhere
+                if isinstance(e, urllib.error.HTTPError) and e.code < 500:
+                    break
+                retries += 1
+                if backend:
+                    backend.record_failure()
+                    tried.add(backend)
+                if retries <= max_retries:
+                    # Exponential backoff with jitter, so concurrent retries don't hit a degraded pool in lockstep
+                    time.sleep(min(0.05 * 2 ** (retries - 1), 0.25) + random.random() * 0.02)
+                continue
+
+            # The backend has answered; from here on a failure is the client going away, which says
+            # nothing about the backend's health and can't be retried once bytes have been written
+            try:
                 if cached_response:
-                    # Use cached response
-                    status_code, headers, content = cached_response
-                    self.send_response(status_code)
-                    for key, value in headers:
-                        if key.lower() not in ['connection', 'keep-alive', 'proxy-authenticate',
-                                             'proxy-authorization', 'te', 'trailers', 'transfer-encoding',
-                                             'upgrade']:
-                            self.send_header(key, value)
-                    self.send_header('X-Cache', 'HIT')
-                    self.end_headers()
-                    self.wfile.write(content)
+                    # Use cached response: prebuilt status line, headers and body in the client's encoding
+                    self.log_request(cached_response[0])
+                    self.wfile.write(self.get_cached_response(cached_response, accepted_encoding))
                     if self.debug:
                         print(f"Cache HIT for {self.path}")
-                    return  # Successfully used cache, no need to retry
-                else:
-                    # Create request
-                    request = urllib.request.Request(
-                        backend_url,
-                        data=body,
-                        headers=headers,
-                        method=method
-                    )
-
-                    # Forward the request to the backend server using our SSL context
-                    with urllib.request.urlopen(request, context=self.ssl_context) as response:
-                        # Set response status code
+                    return  # Successfully used cache
+
+                try:
+                    # Get response headers before sending
+                    response_headers = list(response.getheaders())
+
+                    if stream:
                         self.send_response(response.status)
-                        
-                        # Get response headers before sending
-                        response_headers = list(response.getheaders())
-                        
-                        # Read response content
-                        content = response.read()
-
-                        # Compress content if needed
-                        if accepted_encoding != 'identity':
-                            content = self.compress_content(content, accepted_encoding)
-                            self.send_header('Content-Encoding', accepted_encoding)
-                        
-                        # Forward response headers
                         for key, value in response_headers:
-                            if key.lower() not in ['connection', 'keep-alive', 'proxy-authenticate', 
-                                                 'proxy-authorization', 'te', 'trailers', 'transfer-encoding', 
-                                                 'upgrade', 'content-encoding', 'content-length']:
+                            if key.lower() not in _HOP_BY_HOP:
                                 self.send_header(key, value)
-
-                        self.send_header('Content-Length', str(len(content)))
                         self.send_header('X-Cache', 'MISS')
                         self.send_header('X-Backend-Server', backend.url)
                         if retries > 0:
                             self.send_header('X-Retry-Count', str(retries))
                         self.end_headers()
-                        
-                        # Cache the response for GET requests
-                        if method == "GET":
-                            self.cache.put(cache_key, (response.status, response_headers, content))
-                        
-                        # Forward response body
-                        self.wfile.write(content)
-                        return  # Successfully processed request, no need to retry
-
-            except (urllib.error.HTTPError, urllib.error.URLError, Exception) as e:
-                last_exception = e
+                        if bodyless:
+                            return  # Headers only; there is no body to copy
+                        try:
+                            self.stream_body(response)
+                        except (OSError, http.client.HTTPException) as e:
+                            # The status line is already out, so a second response can't follow;
+                            # closing the connection shows the client the body was truncated
+                            if self.debug:
+                                print(f"Streaming {self.path} from {backend.url} failed: {str(e)}")
+                            self.close_connection = True
+                        return  # Processed request, possibly truncated; never retried
+
+                    # Set response status code
+                    self.send_response(response.status)
+
+                    # Compress content if needed; GET responses keep the identity body for the cache
+                    identity = content
+                    if accepted_encoding != 'identity':
+                        content = self.compress_content(content, accepted_encoding)
+                        self.send_header('Content-Encoding', accepted_encoding)
+                    
+                    # Forward response headers, filtered once so the cached copy can be sent as is
+                    forward_headers = [(key, value) for key, value in response_headers
+                                       if key.lower() not in _HOP_BY_HOP_RESP]
+                    for key, value in forward_headers:
+                        self.send_header(key, value)
+
+                    self.send_header('Content-Length', str(len(content)))
+                    self.send_header('X-Cache', 'MISS')
+                    self.send_header('X-Backend-Server', backend.url)
+                    if retries > 0:
+                        self.send_header('X-Retry-Count', str(retries))
+
+                    # Cache the response for GET requests
+                    if method == "GET":
+                        wire = {accepted_encoding: self.build_cached_response(
+                            response.status, forward_headers, accepted_encoding, content)}
+                        self.cache.put(cache_key, (response.status, forward_headers, identity, wire))
+
+                    # Forward response headers and body
+                    self.end_headers_with_body(content)
+                    return  # Successfully processed request
+                finally:
+                    backend.release_connection(conn, response)
+            except OSError as e:
+                # Broken pipe, reset or TLS error on the client socket: drop the connection
                 if self.debug:
-                    print(f"Request failed on backend {backend.url if backend else 'None'}, attempt {retries + 1}/{max_retries + 1}: {str(e)}")
-                retries += 1
-                # Mark the current backend as unhealthy
-                if backend:
-                    backend.healthy = False
-                continue
+                    print(f"Client connection lost while sending response for {self.path}: {str(e)}")
+                self.close_connection = True
+                return
 
-        # If we get here, we've exhausted all retries
+        # If we get here, we've exhausted all retries (or the backend rejected the request)
         if isinstance(last_exception, urllib.error.HTTPError):
             self.send_error(last_exception.code, last_exception.reason)
-        elif isinstance(last_exception, urllib.error.URLError):
-            self.send_error(500, str(last_exception.reason))
         else:
             self.send_error(500, str(last_exception))
 
-class SSLHTTPServer(http.server.HTTPServer):
+# HTTP methods the proxy forwards; each gets an identical do_<METHOD> handler
+PROXIED_METHODS = ("GET", "POST", "PUT", "DELETE", "PATCH", "HEAD", "OPTIONS")
+
+def _make_method_handler(method):
+    if method in ("GET", "HEAD"):
+        def handler(self):
+            # Front door: liveness probes are answered before the API key check and the proxy pipeline
+            if self.path == HEALTHZ_PATH:
+                self.send_prebuilt(_HEALTHZ_RESPONSE)
+            elif self.validate_api_key():
+                self.proxy_request(method)
+    else:
+        def handler(self):
+            if self.validate_api_key():
+                self.proxy_request(method)
+    handler.__name__ = f"do_{method}"
+    handler.__doc__ = f"Handle {method} requests"
+    return handler
+
+for _method in PROXIED_METHODS:
+    setattr(SSLReverseProxyHandler, f"do_{_method}", _make_method_handler(_method))
+
+class SSLHTTPServer(http.server.ThreadingHTTPServer):
+    """
+    HTTPS server that handles connections concurrently on a bounded pool of worker threads.
+
+    Attributes:
+        max_workers (int): Maximum number of connections handled at once; further ones wait in the pool's queue.
+        max_pending (int): Maximum number of connections waiting in that queue; new ones beyond it are closed.
+        handshake_timeout (float): Seconds a client gets to complete the TLS handshake.
+        request_queue_size (int): Listen backlog for connections not yet accepted.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 1024
+    max_workers = 128
+    max_pending = 256
+    handshake_timeout = 10
+
     def __init__(self, server_address, handler_class, certfile, keyfile):
         super().__init__(server_address, handler_class)
         
@@ -272,10 +567,62 @@ class SSLHTTPServer(http.server.HTTPServer):
         self.ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
         self.ssl_context.load_cert_chain(certfile=certfile, keyfile=keyfile)
         
-        # Wrap socket with SSL
-        self.socket = self.ssl_context.wrap_socket(self.socket, server_side=True)
+        # Wrap socket with SSL; the handshake runs on the worker thread so accept() never waits on a client
+        self.socket = self.ssl_context.wrap_socket(self.socket, server_side=True, do_handshake_on_connect=False)
+
+        # Reuse a fixed set of threads instead of starting one per connection
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='proxy-worker')
+        # Connections submitted to the pool and not yet finished, running or queued
+        self._connections = 0
+        self._connections_lock = threading.Lock()
+
+    @property
+    def saturated(self):
+        """True while connections are queued waiting for a worker thread"""
+        return self._connections > self.max_workers
+
+    def process_request(self, request, client_address):
+        """
+        Hand the connection to the worker pool, or close it when max_pending connections already
+        wait there: a queued connection's handshake timeout only starts once a worker picks it up,
+        so an unbounded queue would hold clients indefinitely under load
+        """
+        with self._connections_lock:
+            admitted = self._connections < self.max_workers + self.max_pending
+            if admitted:
+                self._connections += 1
+        if not admitted:
+            self.shutdown_request(request)
+            return
+        self._executor.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        """Handle the connection on a worker thread, then free its place in the connection count"""
+        try:
+            self._handle_connection(request, client_address)
+        finally:
+            with self._connections_lock:
+                self._connections -= 1
+
+    def _handle_connection(self, request, client_address):
+        """Complete the TLS handshake, then handle the connection as ThreadingMixIn would"""
+        try:
+            # Responses already leave in as few writes as possible; don't let Nagle hold the last one
+            request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            request.settimeout(self.handshake_timeout)
+            request.do_handshake()
+            request.settimeout(None)
+        except OSError:
+            # Failed or abandoned handshakes (ssl.SSLError included) are the client's problem, not ours
+            self.shutdown_request(request)
+            return
+        super().process_request_thread(request, client_address)
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=False)
 
-def run_ssl_proxy(port=8443, certfile='ssl/server.crt', keyfile='ssl/server.key', debug=False):
+def run_ssl_proxy(port=8443, certfile='ssl/server.crt', keyfile='ssl/server.key', debug=False, backend_urls=None):
     """
     Run the SSL-enabled reverse proxy server
     
@@ -284,10 +631,16 @@ def run_ssl_proxy(port=8443, certfile='ssl/server.crt', keyfile='ssl/server.key'
         certfile (str): Path to SSL certificate file
         keyfile (str): Path to SSL private key file
         debug (bool): Enable debug logging
+        backend_urls (list): Backend URLs to use instead of the default BACKEND_URLS
     """
     server_address = ('', port)
+    if backend_urls:
+        SSLReverseProxyHandler.BACKEND_URLS = backend_urls
     SSLReverseProxyHandler.debug = debug
-    SSLReverseProxyHandler.load_balancer = LoadBalancer(SSLReverseProxyHandler.BACKEND_URLS, debug)
+    # The load balancer reports through logging; its status table is DEBUG level
+    logging.basicConfig(level=logging.DEBUG if debug else logging.WARNING, format='%(message)s')
+    SSLReverseProxyHandler.load_balancer = LoadBalancer(SSLReverseProxyHandler.BACKEND_URLS, debug,
+                                                        ssl_context=SSLReverseProxyHandler.ssl_context)
     try:
         httpd = SSLHTTPServer(server_address, SSLReverseProxyHandler, certfile, keyfile)
         if debug:
@@ -297,33 +650,45 @@ def run_ssl_proxy(port=8443, certfile='ssl/server.crt', keyfile='ssl/server.key'
     except KeyboardInterrupt:
         if debug:
             print("\nShutting down the server...")
-        httpd.socket.close()
+        SSLReverseProxyHandler.load_balancer.stop()
+        httpd.server_close()
 
 def _generate_self_signed_cert():
     """
     Generate a self-signed certificate for testing purposes
     """
-    from OpenSSL import crypto
+    import datetime
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from cryptography.x509.oid import NameOID
     
     # Generate key
-    key = crypto.PKey()
-    key.generate_key(crypto.TYPE_RSA, 2048)
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
     
     # Generate certificate
-    cert = crypto.X509()
-    cert.get_subject().CN = "localhost"
-    cert.set_serial_number(1000)
-    cert.gmtime_adj_notBefore(0)
-    cert.gmtime_adj_notAfter(365*24*60*60)  # Valid for one year
-    cert.set_issuer(cert.get_subject())
-    cert.set_pubkey(key)
-    cert.sign(key, 'sha256')
+    subject = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(subject)
+        .issuer_name(subject)
+        .public_key(key.public_key())
+        .serial_number(1000)
+        .not_valid_before(now)
+        .not_valid_after(now + datetime.timedelta(days=365))  # Valid for one year
+        .sign(key, hashes.SHA256())
+    )
     
     # Save certificate and private key
     with open("ssl/server.crt", "wb") as f:
-        f.write(crypto.dump_certificate(crypto.FILETYPE_PEM, cert))
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
     with open("ssl/server.key", "wb") as f:
-        f.write(crypto.dump_privatekey(crypto.FILETYPE_PEM, key))
+        f.write(key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.TraditionalOpenSSL,
+            encryption_algorithm=serialization.NoEncryption(),
+        ))
 
 if __name__ == "__main__":
     import os
@@ -331,6 +696,9 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description='Run SSL reverse proxy server')
     parser.add_argument('--debug', action='store_true', help='Enable debug mode')
+    parser.add_argument('--backend-socket', action='append', metavar='PATH',
+                        help='Forward to a backend serving plain HTTP on this Unix domain socket '
+                             '(repeatable; replaces the default TLS backends)')
     args = parser.parse_args()
     
     # Generate self-signed certificate if it doesn't exist
@@ -341,4 +709,5 @@ if __name__ == "__main__":
         if args.debug:
             print("Certificate generated successfully")
     
-    run_ssl_proxy(debug=args.debug)
\ No newline at end of file
+    backend_urls = [unix_socket_url(path) for path in args.backend_socket or []]
+    run_ssl_proxy(debug=args.debug, backend_urls=backend_urls)
\ No newline at end of file